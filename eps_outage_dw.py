@@ -37,6 +37,18 @@ def approx_eps_power(freq, delta_freq, dist_eps, h_tx, h_rx, power_tx=1.0):
     return _part1 * _part2 * _part3
 
 
+def plot_outage_prob(results, eps=1e-3, **kwargs):
+    df = results["df"]
+    fig, axs = plt.subplots()
+    for _name in ("singleActual", "twoActual", "twoLower"):
+        axs.semilogx(df, results[_name], label=_name)
+    axs.set_xlabel("Frequency Spacing $\\Delta f$ [Hz]")
+    axs.set_ylabel("$\\varepsilon$-Outage Power")
+    axs.set_title(f"$\\varepsilon=${eps:E}")
+    axs.legend()
+    return fig
+
+
 def main_outage_prob(
     freq,
     h_tx,
@@ -45,6 +57,7 @@ def main_outage_prob(
     eps=1e-3,
     c=constants.c,
     num_samples=100000,
+    distance=None,
     plot=False,
     export=False,
     **kwargs,
@@ -53,9 +66,15 @@ def main_outage_prob(
     LOGGER.info(
         f"Simulating outage probability with parameters: f1={freq:E}, h_tx={h_tx:.1f}, h_rx={h_rx:.1f}"
     )
-    LOGGER.info(f"Number of samples: {num_samples:E}")
-    rv_distance = stats.expon(loc=10, scale=15)
-    distance = rv_distance.rvs(size=num_samples)
+    if distance is None:
+        rv_distance = stats.expon(loc=10, scale=15)
+        distance = rv_distance.rvs(size=num_samples)
+    LOGGER.info(f"Number of samples: {len(distance):E}")
+    if len(distance) < int(2 / eps):
+        LOGGER.warning(
+            f"Only {len(distance):d} samples for eps={eps:E}. "
+            f"At least {int(2 / eps):d} are needed for reliable estimates."
+        )
 
     if df is None:
         df = np.logspace(7, np.log10(freq), 300)
@@ -68,17 +87,9 @@ def main_outage_prob(
                 results[_k] = []
             results[_k].append(_v.ppf(eps))
 
-    if plot:
-        fig, axs = plt.subplots()
-        for _name, _prob in results.items():
-            # axs.semilogy(threshold, _prob, label=_name)
-            axs.semilogx(df, _prob, label=_name)
-        axs.set_xlabel("Frequency Spacing $\\Delta f$ [Hz]")
-        axs.set_ylabel("$\\varepsilon$-Outage Power")
-        axs.set_title(f"$\\varepsilon=${eps:E}")
-        axs.legend()
-
     results["df"] = df
+    if plot:
+        plot_outage_prob(results, eps=eps)
     if export:
         LOGGER.info("Exporting results.")
         export_results(
@@ -0,0 +1,126 @@
+import logging
+
+import numpy as np
+from scipy import constants
+
+from single_frequency import crit_dist, crit_dist_pi, delta_phi
+from util import to_decibel
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+def critical_distances(freqs, h_tx, h_rx, d_min=0, d_max=np.inf, c=constants.c):
+    _dist = [crit_dist(f, h_tx, h_rx, c=c) for f in freqs]
+    _dist.extend([crit_dist_pi(f, h_tx, h_rx, c=c) for f in freqs])
+    _dist = np.concatenate(_dist)
+    _dist = _dist[(_dist > d_min) & (_dist < d_max)]
+    return np.unique(_dist)
+
+
+def phase_grid(freq, h_tx, h_rx, d_min, d_max, points_per_period=8, c=constants.c):
+    # Distances that are equidistant in the phase difference of the two rays,
+    # i.e., the grid resolves every oscillation of the receive power at freq
+    a = h_tx - h_rx
+    b = h_tx + h_rx
+    phi_max = delta_phi(d_min, freq, h_tx, h_rx, c=c)
+    phi_min = delta_phi(d_max, freq, h_tx, h_rx, c=c)
+    num_points = int(np.ceil((phi_max - phi_min) / (2 * np.pi) * points_per_period))
+    phi = np.linspace(phi_min, phi_max, num_points + 1)
+    _delta = phi * c / (2 * np.pi * freq)
+    _s = (b**2 - a**2 - _delta**2) / (2 * _delta)
+    return np.sqrt(np.maximum(_s**2 - a**2, 0))
+
+
+def adaptive_distance_mesh(
+    func,
+    d_min,
+    d_max,
+    nodes=(),
+    tol_db=0.1,
+    num_initial=100,
+    max_points=20000,
+    max_iter=30,
+):
+    # Start from a log grid plus the given nodes, e.g., the known extrema
+    # (exact null depths) and a phase_grid that resolves the oscillations, and
+    # split all intervals at their quarter points in which the power deviates
+    # more than tol_db from the linear interpolation (in dB over log-distance).
+    distance = np.geomspace(d_min, d_max, num_initial)
+    nodes = np.asarray(nodes, dtype=float)
+    nodes = nodes[(nodes > d_min) & (nodes < d_max)]
+    distance = np.unique(np.concatenate((distance, nodes)))
+    power = func(distance)
+    _single_curve = np.ndim(power) == 1
+    power_db = np.atleast_2d(to_decibel(power))
+
+    # Only the sub-intervals created in the previous step are tested again and
+    # the quarter points of split intervals are reused as new nodes
+    _pending = np.ones(len(distance) - 1, dtype=bool)
+    _num_refine = 0
+    for _iter in range(max_iter):
+        _idx = np.flatnonzero(_pending)
+        _log_lower = np.log(distance[_idx])
+        _log_upper = np.log(distance[_idx + 1])
+        _error = np.zeros(len(_idx))
+        _new_d = []
+        _new_db = []
+        for _t in (0.25, 0.5, 0.75):
+            _d = np.exp((1 - _t) * _log_lower + _t * _log_upper)
+            _d_db = np.atleast_2d(to_decibel(func(_d)))
+            _interp_db = (1 - _t) * power_db[:, _idx] + _t * power_db[:, _idx + 1]
+            _error = np.maximum(
+                _error, np.max(np.abs(_d_db - _interp_db), axis=0)
+            )
+            _new_d.append(_d)
+            _new_db.append(_d_db)
+        _refine = _error > tol_db
+        _num_refine = np.count_nonzero(_refine)
+        if _num_refine == 0 or len(distance) + 3 * _num_refine > max_points:
+            break
+        distance = np.concatenate([distance] + [_d[_refine] for _d in _new_d])
+        power_db = np.concatenate(
+            [power_db] + [_d_db[:, _refine] for _d_db in _new_db], axis=1
+        )
+        _is_new = np.arange(len(distance)) >= len(distance) - 3 * _num_refine
+        _order = np.argsort(distance)
+        distance = distance[_order]
+        power_db = power_db[:, _order]
+        _is_new = _is_new[_order]
+        _pending = _is_new[:-1] | _is_new[1:]
+    if _num_refine > 0:
+        LOGGER.warning(
+            f"Mesh not converged to {tol_db:.2f}dB with {len(distance):d} points."
+        )
+    LOGGER.debug(f"Adaptive mesh with {len(distance):d} points.")
+    power = 10 ** (power_db / 10.0)
+    if _single_curve:
+        power = power[0]
+    return distance, power
+
+
+def minmax_decimation(distance, values, num_points=500):
+    # Keep the first/last point and the min/max of each curve per log-bin,
+    # i.e., at most 2 + 2 * len(values) points per bin
+    distance = np.asarray(distance)
+    values = np.atleast_2d(values)
+    _min_points = 2 + 2 * len(values)
+    if num_points < _min_points:
+        raise ValueError(
+            f"At least {_min_points:d} points are needed to keep the minima "
+            f"and maxima of {len(values):d} curves."
+        )
+    if len(distance) <= num_points:
+        return np.arange(len(distance))
+    num_bins = num_points // _min_points
+    _edges = np.geomspace(distance[0], distance[-1], num_bins + 1)
+    _bins = np.searchsorted(_edges, distance, side="right") - 1
+    _bins = np.clip(_bins, 0, num_bins - 1)
+    _starts = np.flatnonzero(np.diff(_bins, prepend=-1))
+    _ends = np.append(_starts[1:], len(distance)) - 1
+    idx = [_starts, _ends]
+    for _values in values:
+        _order = np.lexsort((_values, _bins))
+        idx.append(_order[_starts])
+        idx.append(_order[_ends])
+    return np.unique(np.concatenate(idx))
@@ -9,22 +9,16 @@ import matplotlib.pyplot as plt
 from single_frequency import crit_dist, crit_dist_pi
 from two_frequencies import sum_power_lower_envelope, sum_power
 from outage_probability import get_intersections
+from mesh import adaptive_distance_mesh
 from util import export_results, to_decibel
 
 
 LOGGER = logging.getLogger(__name__)
 
 
-def main_power_intervals(
-    freq, h_tx, h_rx, df: float, sensitivity: float, c=constants.c, plot=False, **kwargs
-):
-    distance = np.logspace(0, 3, 1000)
-    power = sum_power_lower_envelope(distance, df, freq, h_tx, h_rx)
-    power_db = to_decibel(power)
+def monotonic_intervals(freq, h_tx, h_rx, df: float, sensitivity: float):
     dist_min = crit_dist(df, h_tx, h_rx)
     dist_max = crit_dist_pi(df, h_tx, h_rx)
-    LOGGER.info(f"Distances of local minima: {dist_min}")
-    LOGGER.info(f"Distances of local maxima: {dist_max}")
 
     sens_lin = 10 ** (sensitivity / 10.0)
 
@@ -43,22 +37,62 @@ def main_power_intervals(
     _d_intersect_negative = get_intersections(
         _increasing_intervals, sensitivity, df, freq, h_tx, h_rx
     )
+    return dist_min, dist_max, _d_intersect_positive, _d_intersect_negative
+
+
+def plot_power_intervals(results, freq, h_tx, h_rx, df, sensitivity, **kwargs):
+    distance = results["distance"]
+    dist_min, dist_max, _d_intersect_positive, _d_intersect_negative = (
+        monotonic_intervals(freq, h_tx, h_rx, df, sensitivity)
+    )
+    fig, axs = plt.subplots()
+    xlim = [min(distance), max(distance)]
+    ylim = [-120, -50]
+    axs.set_xlim(xlim)
+    axs.set_ylim(ylim)
+    axs.semilogx(distance, results["envelope"])
+    axs.vlines(dist_min, *ylim, colors="g", ls="--")
+    axs.vlines(dist_max, *ylim, colors="r", ls="-.")
+    axs.vlines(_d_intersect_positive, *ylim, colors="k", ls="dotted")
+    axs.vlines(_d_intersect_negative, *ylim, colors="k", ls="dotted")
+    axs.hlines(sensitivity, *xlim, colors="k")
+    return fig
+
+
+def main_power_intervals(
+    freq,
+    h_tx,
+    h_rx,
+    df: float,
+    sensitivity: float,
+    c=constants.c,
+    d_min=1e0,
+    d_max=1e3,
+    tol_db=0.1,
+    plot=False,
+    **kwargs,
+):
+    dist_min, dist_max, _d_intersect_positive, _d_intersect_negative = (
+        monotonic_intervals(freq, h_tx, h_rx, df, sensitivity)
+    )
+    distance, power = adaptive_distance_mesh(
+        lambda d: sum_power_lower_envelope(d, df, freq, h_tx, h_rx),
+        d_min,
+        d_max,
+        nodes=np.concatenate((dist_min, dist_max)),
+        tol_db=tol_db,
+    )
+    power_db = to_decibel(power)
+    LOGGER.info(f"Distances of local minima: {dist_min}")
+    LOGGER.info(f"Distances of local maxima: {dist_max}")
     LOGGER.info(f"Sensitivity threshold: {sensitivity:.1f}dB")
     LOGGER.info(f"Intersections in increasing intervals: {_d_intersect_negative}")
     LOGGER.info(f"Intersections in decreasing intervals: {_d_intersect_positive}")
 
+    results = {"distance": distance, "envelope": power_db}
     if plot:
-        fig, axs = plt.subplots()
-        xlim = [min(distance), max(distance)]
-        ylim = [-120, -50]
-        axs.set_xlim(xlim)
-        axs.set_ylim(ylim)
-        axs.semilogx(distance, power_db)
-        axs.vlines(dist_min, *ylim, colors="g", ls="--")
-        axs.vlines(dist_max, *ylim, colors="r", ls="-.")
-        axs.vlines(_d_intersect_positive, *ylim, colors="k", ls="dotted")
-        axs.vlines(_d_intersect_negative, *ylim, colors="k", ls="dotted")
-        axs.hlines(sensitivity, *xlim, colors="k")
+        plot_power_intervals(results, freq, h_tx, h_rx, df, sensitivity)
+    return results
 
 
 if __name__ == "__main__":
@@ -70,6 +104,9 @@ if __name__ == "__main__":
     parser.add_argument("-f", "--freq", type=float, default=2.4e9)
     parser.add_argument("-s", "--sensitivity", type=float, default=-79)
     parser.add_argument("-df", type=float, default=250e6)
+    parser.add_argument("-dmin", "--d_min", type=float, default=1.0)
+    parser.add_argument("-dmax", "--d_max", type=float, default=1000.0)
+    parser.add_argument("--tol_db", type=float, default=0.1)
     parser.add_argument("--plot", action="store_true")
     parser.add_argument(
         "-v", "--verbosity", action="count", default=0, help="Increase output verbosity"
@@ -84,6 +84,22 @@ def _main_power_rv(distance, freq, h_tx, h_rx, df):
     return powers_rv
 
 
+def plot_outage_prob_power(results, **kwargs):
+    threshold = results["threshold"]
+    fig, axs = plt.subplots()
+    for _name in ("singleActual", "twoActual", "twoLower"):
+        axs.semilogy(threshold, results[_name], label=_name, marker="o")
+    axs.semilogy(threshold, results["twoLowerAnalytical"], "k-", label="Analytical")
+    axs.semilogy(threshold, results["twoApprox"], "k--", label="Approximation")
+    axs.semilogy(threshold, results["twoLowerApprox"], "k--", label="Approximation")
+    axs.set_xlabel("Receiver Sensitivity [dB]")
+    axs.set_ylabel("Outage Probability")
+    axs.set_xlim([min(threshold), max(threshold)])
+    axs.set_ylim([1e-8, 1.5])
+    axs.legend()
+    return fig
+
+
 def main_outage_prob_power(
     freq,
     h_tx,
@@ -91,6 +107,8 @@ def main_outage_prob_power(
     df: float,
     c=constants.c,
     num_samples=100000,
+    rv_distance=None,
+    distance=None,
     plot=False,
     export=False,
     **kwargs,
@@ -99,10 +117,11 @@ def main_outage_prob_power(
         f"Simulating outage probability with parameters: "
         f"f1={freq:E}, h_tx={h_tx:.1f}, h_rx={h_rx:.1f}"
     )
-    LOGGER.info(f"Number of samples: {num_samples:E}")
-
-    rv_distance = stats.uniform(loc=50, scale=40)
-    distance = rv_distance.rvs(size=num_samples)
+    if rv_distance is None:
+        rv_distance = stats.uniform(loc=50, scale=40)
+    if distance is None:
+        distance = rv_distance.rvs(size=num_samples)
+    LOGGER.info(f"Number of samples: {len(distance):E}")
     powers_rv = _main_power_rv(distance, freq, h_tx, h_rx, df)
 
     threshold = np.linspace(-120, -60, 1500)
@@ -137,23 +156,12 @@ def main_outage_prob_power(
         f"The worst-case approximation is valid for: s < {to_decibel(_approx_min_s):.1f}dB"
     )
 
-    if plot:
-        fig, axs = plt.subplots()
-        for _name, _prob in results.items():
-            axs.semilogy(threshold, _prob, label=_name, marker="o")
-        axs.semilogy(threshold, outage_prob_analytical, "k-", label="Analytical")
-        axs.semilogy(threshold, approx_out_prob, "k--", label="Approximation")
-        axs.semilogy(threshold, approx_out_prob_upper, "k--", label="Approximation")
-        axs.set_xlabel("Receiver Sensitivity [dB]")
-        axs.set_ylabel("Outage Probability")
-        axs.set_xlim([min(threshold), max(threshold)])
-        axs.set_ylim([1e-8, 1.5])
-        axs.legend()
-
     results["twoLowerAnalytical"] = outage_prob_analytical
     results["twoLowerApprox"] = approx_out_prob_upper
     results["twoApprox"] = approx_out_prob
     results["threshold"] = threshold
+    if plot:
+        plot_outage_prob_power(results)
     if export:
         LOGGER.info("Exporting results.")
         export_results(
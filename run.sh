@@ -10,19 +10,13 @@
 # Copyright (C) 2023
 # License: GPLv3
 
-FREQ="2.4e9"
-DF="250e6"
-HTX="10"
-HRX="1.5"
+set -e
 
-echo "Figure: Monotonic intervals"
-python3 monotonic_intervals.py -v -r "$HRX" -t "$HTX" -f "$FREQ" -df "$DF" --plot -s "-79"
+# The figures and their parameters are defined in experiments.json.
+# Results are written to the output directory as .dat files. Jobs whose inputs
+# and outputs did not change since the last run are skipped.
+echo "Running experiments"
+python3 run_experiments.py -v experiments.json
 
-echo "Figure: Outage probability"
-python3 outage_probability.py -v -r "$HRX" -t "$HTX" -f "$FREQ" -df "$DF" --plot --export --num_samples "100_000_000"
-
-echo "Figure: Sum power, lower envelope, and approximations"
-python3 two_frequencies.py -v -r "$HRX" -t "$HTX" -f "$FREQ" -df "$DF" --plot --export
-
-echo "Figure: Eps-outage power over frequency spacing"
-python3 eps_outage_dw.py -v -r "$HRX" -t "$HTX" -f "$FREQ" --plot --export --eps "1e-4"
+echo "Plotting results"
+python3 run_experiments.py experiments.json --plot
@@ -0,0 +1,252 @@
+import os
+import sys
+import ast
+import json
+import time
+import hashlib
+import logging
+import importlib
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from util import export_results
+
+
+LOGGER = logging.getLogger(__name__)
+
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_FILE = "cache.json"
+
+
+def _hash_obj(obj):
+    _serialized = json.dumps(obj, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(_serialized).hexdigest()
+
+
+def _hash_file(filename):
+    _hash = hashlib.sha256()
+    with open(filename, "rb") as _file:
+        for _chunk in iter(lambda: _file.read(1 << 20), b""):
+            _hash.update(_chunk)
+    return _hash.hexdigest()
+
+
+def _local_imports(module, source_dir=SOURCE_DIR):
+    modules = set()
+    _queue = [module]
+    while _queue:
+        _module = _queue.pop()
+        _filename = os.path.join(source_dir, f"{_module}.py")
+        if _module in modules or not os.path.isfile(_filename):
+            continue
+        modules.add(_module)
+        with open(_filename, "r", encoding="utf-8") as _file:
+            _tree = ast.parse(_file.read())
+        for _node in ast.walk(_tree):
+            if isinstance(_node, ast.Import):
+                _queue.extend(_alias.name for _alias in _node.names)
+            elif isinstance(_node, ast.ImportFrom) and _node.module is not None:
+                _queue.append(_node.module)
+    return sorted(modules)
+
+
+def _hash_sources(module, source_dir=SOURCE_DIR):
+    sources = [f"{_module}.py" for _module in _local_imports(module, source_dir)]
+    return _hash_obj({f: _hash_file(os.path.join(source_dir, f)) for f in sources})
+
+
+def load_experiment(filename):
+    with open(filename, "r", encoding="utf-8") as _file:
+        experiment = json.load(_file)
+    experiment.setdefault("output_dir", "results")
+    experiment.setdefault("defaults", {})
+    experiment.setdefault("samples", {})
+    return experiment
+
+
+def expand_jobs(experiment):
+    jobs = []
+    for figure in experiment["figures"]:
+        sweep = figure.get("sweep", {})
+        sweep_keys = sorted(sweep)
+        for _values in itertools.product(*[sweep[k] for k in sweep_keys]):
+            _sweep_params = dict(zip(sweep_keys, _values))
+            params = {**experiment["defaults"], **figure.get("params", {})}
+            params.update(_sweep_params)
+            _suffix = "".join(f"-{k}{v}" for k, v in _sweep_params.items())
+            name = f"{figure['name']}{_suffix}"
+            jobs.append(
+                {
+                    "name": name,
+                    "figure": figure["name"],
+                    "function": figure["function"],
+                    "params": params,
+                    "samples": figure.get("samples"),
+                    "output": os.path.join(experiment["output_dir"], f"{name}.dat"),
+                }
+            )
+    return jobs
+
+
+def _rv_from_spec(spec):
+    distribution = getattr(stats, spec["distribution"])
+    return distribution(loc=spec.get("loc", 0), scale=spec.get("scale", 1))
+
+
+def prepare_samples(spec, name, output_dir):
+    key = _hash_obj(spec)[:12]
+    filename = os.path.join(output_dir, "samples", f"{name}-{key}.npy")
+    if os.path.isfile(filename):
+        LOGGER.info(f"Reusing distance samples '{name}' from {filename}")
+        return filename
+    LOGGER.info(f"Drawing {spec['size']:E} distance samples '{name}'")
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    rng = np.random.default_rng(spec.get("seed"))
+    samples = _rv_from_spec(spec).rvs(size=int(spec["size"]), random_state=rng)
+    with open(f"{filename}.tmp", "wb") as _file:
+        np.save(_file, samples)
+    os.replace(f"{filename}.tmp", filename)
+    return filename
+
+
+def _import_function(name):
+    _module, _func = name.rsplit(".", 1)
+    return getattr(importlib.import_module(_module), _func)
+
+
+def run_job(job, samples_spec=None, samples_file=None):
+    func = _import_function(job["function"])
+    params = dict(job["params"])
+    if samples_file is not None:
+        params["distance"] = np.load(samples_file, mmap_mode="r")
+        params["rv_distance"] = _rv_from_spec(samples_spec)
+    _start = time.perf_counter()
+    results = func(**params, plot=False, export=False)
+    export_results(results, job["output"])
+    return time.perf_counter() - _start
+
+
+def main_run(experiment_file, workers=None, force=False, **kwargs):
+    experiment = load_experiment(experiment_file)
+    output_dir = experiment["output_dir"]
+    os.makedirs(output_dir, exist_ok=True)
+    cache_file = os.path.join(output_dir, CACHE_FILE)
+    cache = {}
+    if os.path.isfile(cache_file):
+        with open(cache_file, "r", encoding="utf-8") as _file:
+            cache = json.load(_file)
+
+    jobs = expand_jobs(experiment)
+    _used_samples = {job["samples"] for job in jobs if job["samples"] is not None}
+    samples_files = {
+        name: prepare_samples(experiment["samples"][name], name, output_dir)
+        for name in sorted(_used_samples)
+    }
+    samples_hashes = {name: _hash_file(f) for name, f in samples_files.items()}
+
+    timings = {}
+    pending = {}
+    failed = []
+    for job in jobs:
+        _samples = job["samples"]
+        _samples_spec = experiment["samples"].get(_samples)
+        input_hash = _hash_obj(
+            {
+                "function": job["function"],
+                "params": job["params"],
+                "samples": _samples_spec,
+                "samples_data": samples_hashes.get(_samples),
+                "sources": _hash_sources(job["function"].rsplit(".", 1)[0]),
+            }
+        )
+        _cached = cache.get(job["name"], {})
+        if (
+            not force
+            and _cached.get("input") == input_hash
+            and os.path.isfile(job["output"])
+            and _cached.get("output") == _hash_file(job["output"])
+        ):
+            LOGGER.info(f"Skipping unchanged job: {job['name']}")
+            timings[job["name"]] = None
+            continue
+        pending[job["name"]] = (job, _samples_spec, samples_files.get(_samples))
+        cache[job["name"]] = {"input": input_hash}
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(run_job, *_args): _name for _name, _args in pending.items()
+        }
+        for future in as_completed(futures):
+            _name = futures[future]
+            try:
+                timings[_name] = future.result()
+            except Exception:
+                LOGGER.exception(f"Job failed: {_name}")
+                del cache[_name]
+                failed.append(_name)
+                timings[_name] = float("nan")
+                continue
+            LOGGER.info(f"Finished job {_name} in {timings[_name]:.1f}s")
+            cache[_name]["output"] = _hash_file(pending[_name][0]["output"])
+
+    with open(cache_file, "w", encoding="utf-8") as _file:
+        json.dump(cache, _file, indent=4, sort_keys=True)
+
+    print("Job timings:")
+    for job in jobs:
+        _time = timings[job["name"]]
+        _status = "cached" if _time is None else f"{_time:.1f}s"
+        print(f"  {job['name']:<40s} {_status:>10s}")
+    if failed:
+        sys.exit(f"Failed jobs: {', '.join(failed)}")
+    return timings
+
+
+def main_plot(experiment_file, **kwargs):
+    import matplotlib.pyplot as plt
+
+    experiment = load_experiment(experiment_file)
+    _figures = {figure["name"]: figure for figure in experiment["figures"]}
+    for job in expand_jobs(experiment):
+        if not os.path.isfile(job["output"]):
+            LOGGER.warning(f"No results for job {job['name']}. Run it first.")
+            continue
+        _plot = _figures[job["figure"]].get("plot")
+        if _plot is None:
+            continue
+        results = pd.read_csv(job["output"], sep="\t")
+        _import_function(_plot)(results, **job["params"])
+    plt.show()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("experiment_file", nargs="?", default="experiments.json")
+    parser.add_argument("-j", "--workers", type=int, default=None)
+    parser.add_argument("--force", action="store_true")
+    parser.add_argument("--plot", action="store_true")
+    parser.add_argument(
+        "-v", "--verbosity", action="count", default=0, help="Increase output verbosity"
+    )
+    args = vars(parser.parse_args())
+    verb = args.pop("verbosity")
+    plot = args.pop("plot")
+    logging.basicConfig(
+        format="%(asctime)s - %(module)s -- [%(levelname)8s]: %(message)s",
+        handlers=[
+            logging.FileHandler("main.log", encoding="utf-8"),
+            logging.StreamHandler(),
+        ],
+    )
+    loglevel = logging.WARNING - verb * 10
+    LOGGER.setLevel(loglevel)
+    if plot:
+        main_plot(**args)
+    else:
+        main_run(**args)
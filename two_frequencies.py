@@ -9,6 +9,12 @@ from util import export_results, to_decibel
 
 from model import length_los, length_ref
 from single_frequency import rec_power, crit_dist, rec_power_approx
+from mesh import (
+    critical_distances,
+    phase_grid,
+    adaptive_distance_mesh,
+    minmax_decimation,
+)
 
 LOGGER = logging.getLogger(__name__)
 
@@ -57,19 +63,52 @@ def sum_power_lower_envelope(
     return power_rx
 
 
+def plot_power_two_freq(results, **kwargs):
+    distance = results["distance"]
+    fig, axs = plt.subplots()
+    axs.semilogx(distance, results["powerSum"])
+    axs.semilogx(distance, results["envelope"])
+    axs.semilogx(distance, results["approx"], "--")
+    axs.semilogx(distance, results["approxLower"], "--")
+    return fig
+
+
 def main_power_two_freq(
-    freq, delta_freq, h_tx, h_rx, plot=False, export=False, **kwargs
+    freq,
+    delta_freq,
+    h_tx,
+    h_rx,
+    d_min=1e1,
+    d_max=1e4,
+    tol_db=0.1,
+    num_export=None,
+    plot=False,
+    export=False,
+    **kwargs,
 ):
-    # distance = np.logspace(0, 3, 2000)
-    distance = np.logspace(1, 4, 2000)
-    power_rx = rec_power(distance, freq, h_tx, h_rx)
-    power_rx_db = to_decibel(power_rx)
     freq2 = freq + delta_freq
-    power_rx2 = rec_power(distance, freq2, h_tx, h_rx)
-    power_rx2_db = to_decibel(power_rx2)
-    power_sum = 0.5 * (power_rx + power_rx2)
+    # Extrema of the lower envelope and a grid that resolves the oscillations
+    # of the sum power (which are at most as fast as the ones at freq2)
+    nodes = np.concatenate(
+        (
+            critical_distances([delta_freq], h_tx, h_rx, d_min=d_min, d_max=d_max),
+            phase_grid(freq2, h_tx, h_rx, d_min, d_max),
+        )
+    )
+
+    def _powers(d):
+        return np.vstack(
+            (
+                sum_power(d, delta_freq, freq, h_tx, h_rx),
+                sum_power_lower_envelope(d, delta_freq, freq, h_tx, h_rx),
+            )
+        )
+
+    distance, (power_sum, power_sum_lower) = adaptive_distance_mesh(
+        _powers, d_min, d_max, nodes=nodes, tol_db=tol_db
+    )
+    LOGGER.info(f"Number of distance points: {len(distance):d}")
     power_sum_db = to_decibel(power_sum)
-    power_sum_lower = sum_power_lower_envelope(distance, delta_freq, freq, h_tx, h_rx)
     power_sum_lower_db = to_decibel(power_sum_lower)
     power_sum_approx = rec_power_approx(distance, h_tx, h_rx)
     power_sum_approx_db = to_decibel(power_sum_approx)
@@ -86,11 +125,12 @@ def main_power_two_freq(
     }
 
     if plot:
-        fig, axs = plt.subplots()
-        axs.semilogx(distance, power_sum_db)
-        axs.semilogx(distance, power_sum_lower_db)
-        axs.semilogx(distance, power_sum_approx_db, "--")
-        axs.semilogx(distance, power_sum_lower_approx_db, "--")
+        plot_power_two_freq(results)
+    if num_export is not None:
+        _idx = minmax_decimation(
+            distance, (power_sum_db, power_sum_lower_db), num_points=num_export
+        )
+        results = {k: v[_idx] for k, v in results.items()}
     if export:
         LOGGER.debug("Exporting single frequency power results.")
         export_results(
@@ -109,7 +149,14 @@ if __name__ == "__main__":
     parser.add_argument("-f", "--freq", type=float, default=2.4e9)
     parser.add_argument("-df", "--delta_freq", type=float, default=250e6)
     parser.add_argument("-dmin", "--d_min", type=float, default=10.0)
-    parser.add_argument("-dmax", "--d_max", type=float, default=100.0)
+    parser.add_argument("-dmax", "--d_max", type=float, default=10000.0)
+    parser.add_argument("--tol_db", type=float, default=0.1)
+    parser.add_argument(
+        "--num_export",
+        type=int,
+        default=None,
+        help="Maximum number of exported points (at least 6)",
+    )
     parser.add_argument("--plot", action="store_true")
     parser.add_argument("--export", action="store_true")
     parser.add_argument(